@@ -21,6 +21,9 @@ Usage:
 """
 
 import argparse
+import codecs
+import concurrent.futures
+import functools
 import json
 import os
 import re
@@ -28,87 +31,316 @@ import sys
 import unicodedata
 import urllib.parse
 
-import pandas as pd
+import xlsxwriter
+
+try:
+    import orjson  # optional: several times faster than the stdlib json module
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 # Excel cell content limit
 EXCEL_CELL_LIMIT = 32767
 
-# Recognized license file names (case-insensitive)
-LICENSE_BASENAMES = {
-    "license", "license.txt", "license.md", "licence", "licence.txt", "licence.md",
-    "copying", "copying.txt", "copying.md"  # some projects use COPYING
-}
+# Fixed output columns as (header, width); License_Chunk_i columns follow
+COLUMNS = (
+    ("Path", 120),     # license file OR package dir
+    ("Homepage", 60),
+    ("Name", 40),
+    ("License", 24),   # declared in the manifest
+    ("Version", 16),
+)
+CHUNK_COLUMN_WIDTH = 60
+
+# LICENSE files larger than this are skipped (guards against binaries named LICENSE*)
+MAX_LICENSE_BYTES = 4 * 1024 * 1024
+
+# Recognized license file name prefixes (case-insensitive), e.g. LICENSE, LICENCE.md, COPYING.txt
+LICENSE_PREFIXES = ("license", "licence", "copying")  # some projects use COPYING
 
 # Recognized manifest file names (case-insensitive)
 MANIFEST_BASENAMES = {"package.json", "package"}  # some systems or tooling may use 'package' without .json
 
+# Directories never descended into while scanning for manifests
+SKIP_DIR_NAMES = {".git", ".cache", ".bin"}
 
-def is_probably_text(data: bytes) -> bool:
-    """Heuristic: treat as text if decodes with limited errors and has no NULs."""
-    if b"\x00" in data:
-        return False
-    try:
-        text = data.decode("utf-8", errors="replace")
-    except Exception:
-        return False
-    replacements = text.count("\ufffd")
-    return replacements < max(5, len(text) * 0.002)
+# os.scandir accepts directory fds on POSIX, letting the walker open children relative to their parent
+_SCANDIR_FD = os.scandir in os.supports_fd and hasattr(os, "O_DIRECTORY")
+
+# Most common LICENSE file names, probed directly before listing the package directory
+LICENSE_CANDIDATES = ("LICENSE", "LICENSE.md", "LICENSE.txt", "license")
+
+# Subdirectories searched (one level deep) when a package has no top-level LICENSE
+LICENSE_SUBDIRS = ("dist", "lib", "src")
+
+# npm convention for pointing the license field at a bundled file
+SEE_LICENSE_IN = "SEE LICENSE IN "
+
+# Last node_modules path segment marks where a package's own directory starts
+_NODE_MODULES_SEGMENT = os.sep + "node_modules" + os.sep
+
+# git@host:path repository URLs
+_GIT_SSH_RE = re.compile(r"^git@([^:]+):(.+)$")
+
+# Repository short-form prefixes (github:user/repo) -> domain
+_HOST_MAP = {"github": "github.com", "gitlab": "gitlab.com", "bitbucket": "bitbucket.org"}
 
 
 def read_text_file(path: str) -> str:
     """Read file as UTF-8 (fallback to latin-1) with best-effort decoding."""
     with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size > MAX_LICENSE_BYTES:
+            raise ValueError("File too large")
         raw = f.read()
-    if not is_probably_text(raw):
-        raise ValueError("Binary or non-text file")
     try:
         return raw.decode("utf-8")
     except UnicodeDecodeError:
         return raw.decode("latin-1", errors="replace")
 
 
+def normalize_text(s: str) -> str:
+    """Normalize text to NFC so chunk boundaries and Excel rendering are consistent."""
+    # ASCII is already NFC; str.isascii() is a cheap C-level check and covers most LICENSE files
+    if s.isascii():
+        return s
+    return unicodedata.normalize("NFC", s)
+
+
 def chunk_text(s: str, size: int):
-    """Split text into size-limited chunks, respecting Excel cell limits."""
-    s = unicodedata.normalize("NFC", s)
-    return [s[i:i+size] for i in range(0, len(s), size)] or [""]
+    """Lazily split text into size-limited chunks, respecting Excel cell limits."""
+    if not s:
+        yield ""
+        return
+    for i in range(0, len(s), size):
+        yield s[i:i+size]
+
+
+def chunk_count(s: str, size: int) -> int:
+    """Number of chunks chunk_text(s, size) yields."""
+    return -(-len(s) // size) or 1
+
+
+def _iter_tree(root: str, skip_names=SKIP_DIR_NAMES):
+    """
+    Yield (dirpath, filename) for every file under root, depth-first like os.walk.
+    Uses os.scandir so entry types come from the directory listing instead of extra stat calls;
+    on POSIX each directory is opened relative to its parent's fd so the kernel resolves one
+    path component per directory instead of the full path.
+    Directories named in skip_names are pruned; symlinked directories are followed once per target.
+    """
+    seen_links = set()
+    if not _SCANDIR_FD:
+        yield from _iter_tree_paths(root, skip_names, seen_links)
+        return
+    try:
+        fd = os.open(root, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        yield from _iter_tree_fd(fd, root, skip_names, seen_links)
+    finally:
+        os.close(fd)
+
+
+def _iter_tree_fd(dir_fd: int, dirpath: str, skip_names, seen_links):
+    """fd-relative walker behind _iter_tree; keeps one open fd per directory level."""
+    subdirs = []
+    try:
+        with os.scandir(dir_fd) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir():
+                        if _should_descend(entry, dirpath, skip_names, seen_links):
+                            subdirs.append(entry.name)
+                    elif entry.is_file():
+                        yield dirpath, entry.name
+                except OSError:
+                    continue
+    except OSError:
+        return
+    for name in subdirs:
+        try:
+            fd = os.open(name, os.O_RDONLY | os.O_DIRECTORY, dir_fd=dir_fd)
+        except OSError:
+            continue
+        try:
+            yield from _iter_tree_fd(fd, os.path.join(dirpath, name), skip_names, seen_links)
+        finally:
+            os.close(fd)
+
+
+def _iter_tree_paths(root: str, skip_names, seen_links):
+    """Path-based walker behind _iter_tree, for platforms where os.scandir can't take an fd."""
+    stack = [root]
+    while stack:
+        dirpath = stack.pop()
+        subdirs = []
+        try:
+            with os.scandir(dirpath) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir():
+                            if _should_descend(entry, dirpath, skip_names, seen_links):
+                                subdirs.append(entry.path)
+                        elif entry.is_file():
+                            yield dirpath, entry.name
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+        # Reverse so subdirectories are visited in listing order
+        stack.extend(reversed(subdirs))
+
+
+def _should_descend(entry, dirpath: str, skip_names, seen_links) -> bool:
+    """Decide whether the walker enters a directory entry (pruning and symlink cycle checks)."""
+    if entry.name in skip_names:
+        return False
+    if entry.is_symlink():
+        target = os.path.realpath(os.path.join(dirpath, entry.name))
+        real_dirpath = os.path.realpath(dirpath) + os.sep
+        # Skip links already followed and links back to an ancestor (cycles)
+        if target in seen_links or real_dirpath.startswith(target + os.sep):
+            return False
+        seen_links.add(target)
+    return True
 
 
 def find_manifests(root: str):
     """Yield paths to manifests (package.json or 'package') under node_modules."""
     root = os.path.abspath(root)
-    for dirpath, _, filenames in os.walk(root, followlinks=True):
-        if not filenames:
-            continue
-        lower_map = {fn.lower(): fn for fn in filenames}
-        for candidate in MANIFEST_BASENAMES:
-            if candidate in lower_map:
-                yield os.path.join(dirpath, lower_map[candidate])
+    for dirpath, name in _iter_tree(root):
+        if name.lower() in MANIFEST_BASENAMES:
+            yield os.path.join(dirpath, name)
 
 
-def find_first_license(package_dir: str) -> str | None:
+def find_first_license(package_dir: str, data: dict | None = None) -> str | None:
     """
-    Search for the first LICENSE-like file under the package directory (deep search).
+    Search for the first LICENSE-like file of a package.
+    The file declared in the manifest wins, then the usual top-level names (LICENSE_CANDIDATES),
+    then any top-level LICENSE-like file,
+    then one in a common build subdirectory (see LICENSE_SUBDIRS).
     Returns the absolute path or None if not found.
     """
-    for dirpath, _, filenames in os.walk(package_dir, followlinks=True):
-        for name in filenames:
-            lower = name.lower()
-            if lower in LICENSE_BASENAMES or lower.startswith("license"):
-                return os.path.join(dirpath, name)
+    declared = declared_license_path(package_dir, data)
+    if declared:
+        return declared
+
+    # A few stat calls usually hit before having to list the directory
+    for candidate in LICENSE_CANDIDATES:
+        path = os.path.join(package_dir, candidate)
+        if os.path.isfile(path):
+            return path
+
+    found = _scan_for_license(package_dir)
+    if found:
+        return found
+
+    # Rarely the LICENSE only ships inside a build directory; look one level down, no further
+    for subdir in LICENSE_SUBDIRS:
+        found = _scan_for_license(os.path.join(package_dir, subdir))
+        if found:
+            return found
+    return None
+
+
+def _scan_for_license(dir_path: str) -> str | None:
+    """Return the first LICENSE-like file directly inside dir_path (no recursion)."""
+    try:
+        with os.scandir(dir_path) as it:
+            for entry in it:
+                if entry.name.lower().startswith(LICENSE_PREFIXES) and entry.is_file():
+                    return entry.path
+    except OSError:
+        pass
+    return None
+
+
+def declared_license_path(package_dir: str, data: dict | None) -> str | None:
+    """
+    Return the LICENSE file path the manifest points at, if it exists inside the package.
+    Handles:
+      - license: "SEE LICENSE IN <file>"
+      - license: { url: "<relative path>" }
+      - files: [ "LICENSE.md", ... ]  (LICENSE-like entries without glob characters)
+    """
+    if not data:
+        return None
+
+    candidates = []
+    lic = data.get("license") or data.get("licence")
+    if isinstance(lic, str):
+        if lic.upper().startswith(SEE_LICENSE_IN):
+            candidates.append(lic[len(SEE_LICENSE_IN):].strip())
+    elif isinstance(lic, dict):
+        url = lic.get("url")
+        if isinstance(url, str) and "://" not in url:
+            candidates.append(url.strip())
+
+    files = data.get("files")
+    if isinstance(files, list):
+        for entry in files:
+            if (isinstance(entry, str)
+                    and os.path.basename(entry).lower().startswith(LICENSE_PREFIXES)
+                    and not any(c in entry for c in "*?[")):
+                candidates.append(entry.strip())
+
+    for rel in candidates:
+        if not rel:
+            continue
+        path = os.path.normpath(os.path.join(package_dir, rel))
+        if path.startswith(package_dir + os.sep) and os.path.isfile(path):
+            return path
     return None
 
 
+@functools.lru_cache(maxsize=None)
 def parse_manifest(manifest_path: str) -> dict | None:
-    """Parse manifest JSON file into dict (best-effort)."""
+    """Parse manifest JSON file into dict (best-effort). Results are memoized per path."""
     try:
         with open(manifest_path, "rb") as f:
             raw = f.read()
-        text = raw.decode("utf-8", errors="replace")
-        return json.loads(text)
+        # orjson rejects a UTF-8 BOM, which some manifests carry
+        return _json_loads(raw[3:] if raw.startswith(codecs.BOM_UTF8) else raw)
     except Exception:
         return None
 
 
+def _homepage_from_ssh_url(url: str) -> str | None:
+    """ssh://git@github.com/user/repo.git -> https://github.com/user/repo"""
+    if not url.startswith("ssh://"):
+        return None
+    parsed = urllib.parse.urlparse(url)
+    host = parsed.hostname
+    path = (parsed.path or "").removeprefix("/").removesuffix(".git")
+    if host and path:
+        return f"https://{host}/{path}"
+    return None
+
+
+def _homepage_from_scp_url(url: str) -> str | None:
+    """git@github.com:user/repo.git -> https://github.com/user/repo"""
+    m = _GIT_SSH_RE.match(url)
+    if m:
+        return f"https://{m.group(1)}/{m.group(2).removesuffix('.git')}"
+    return None
+
+
+def _homepage_from_http_url(url: str) -> str | None:
+    """http(s)://...(.git) -> same without .git"""
+    if url.startswith(("http://", "https://")):
+        return url.removesuffix(".git")
+    return None
+
+
+# Repository URL handlers keyed by the first 4 characters (after any 'git+' prefix)
+_REPO_URL_HANDLERS = {
+    "ssh:": _homepage_from_ssh_url,
+    "git@": _homepage_from_scp_url,
+    "http": _homepage_from_http_url,
+}
+
+
 def derive_homepage_from_repository(repo_val) -> str | None:
     """
     Derive a human-friendly homepage URL from a repository value.
@@ -127,46 +359,19 @@ def derive_homepage_from_repository(repo_val) -> str | None:
     else:
         return None
 
+    url = url.removeprefix("git+")
     if not url:
         return None
 
-    # Remove 'git+' prefix when present
-    if url.startswith("git+"):
-        url = url[4:]
-
-    # ssh://git@github.com/user/repo.git -> https://github.com/user/repo
-    if url.startswith("ssh://"):
-        parsed = urllib.parse.urlparse(url)
-        host = parsed.hostname
-        path = parsed.path or ""
-        path = path[1:] if path.startswith("/") else path
-        if path.endswith(".git"):
-            path = path[:-4]
-        if host and path:
-            return f"https://{host}/{path}"
-
-    # git@github.com:user/repo.git -> https://github.com/user/repo
-    m = re.match(r"^git@([^:]+):(.+)$", url)
-    if m:
-        host = m.group(1)
-        path = m.group(2)
-        if path.endswith(".git"):
-            path = path[:-4]
-        return f"https://{host}/{path}"
-
-    # http(s)://...(.git) -> same without .git
-    if url.startswith("http://") or url.startswith("https://"):
-        if url.endswith(".git"):
-            url = url[:-4]
-        return url
+    handler = _REPO_URL_HANDLERS.get(url[:4])
+    if handler:
+        return handler(url)
 
     # Short forms: github:user/repo, gitlab:user/repo, bitbucket:user/repo
-    if ":" in url and not url.startswith(("http://", "https://")):
-        host_key, path = url.split(":", 1)
-        host_map = {"github": "github.com", "gitlab": "gitlab.com", "bitbucket": "bitbucket.org"}
-        domain = host_map.get(host_key.lower())
-        if domain and path:
-            return f"https://{domain}/{path}"
+    host_key, sep, path = url.partition(":")
+    domain = _HOST_MAP.get(host_key.lower())
+    if sep and domain and path:
+        return f"https://{domain}/{path}"
 
     return None
 
@@ -217,19 +422,18 @@ def derive_package_name(pkg_dir: str) -> str | None:
     Handles nested node_modules and scopes, e.g.:
       /path/node_modules/@scope/pkg/... -> @scope/pkg
       /path/node_modules/pkg/...        -> pkg
+    pkg_dir is expected to be absolute already (find_manifests yields absolute paths).
     """
-    norm = os.path.abspath(pkg_dir)
-    parts = norm.split(os.sep)
-    idx = None
-    for i, p in enumerate(parts):
-        if p == "node_modules":
-            idx = i
-    if idx is None or idx + 1 >= len(parts):
+    path = pkg_dir + os.sep
+    anchor = path.rfind(_NODE_MODULES_SEGMENT)
+    rest = path[anchor + len(_NODE_MODULES_SEGMENT):] if anchor != -1 else ""
+    if not rest:
         return os.path.basename(pkg_dir)
 
-    first = parts[idx + 1]
-    if first.startswith("@") and idx + 2 < len(parts):
-        return f"{first}/{parts[idx + 2]}"
+    parts = rest.split(os.sep, 2)
+    first = parts[0]
+    if first.startswith("@") and parts[1]:
+        return f"{first}/{parts[1]}"
     return first
 
 
@@ -247,63 +451,74 @@ def get_homepage(data: dict) -> str | None:
     return None
 
 
-def build_rows(manifests, node_modules_root):
+def _process_manifest(manifest_path: str) -> list:
     """
-    For each manifest (i.e., each package), produce rows:
-    [Path, Homepage, Name, License, Version, chunk1, chunk2, ...]
+    Produce the row for a single manifest (i.e., a single package):
+    [Path, Homepage, Name, License, Version, license_text]
     Where Path = LICENSE file path if found, otherwise the PACKAGE DIRECTORY path.
+    license_text is NFC-normalized but left whole; write_workbook chunks it while writing.
+    """
+    pkg_dir = os.path.dirname(manifest_path)
+    data = parse_manifest(manifest_path)
+
+    homepage = get_homepage(data) or ""
+    declared_license = extract_license_value(data) or ""
+    manifest_name = (data.get("name") or "").strip() if data else ""
+    name = manifest_name or (derive_package_name(pkg_dir) or "")
+    version = (data.get("version") or "").strip() if data else ""
+
+    # Find LICENSE (if any)
+    license_path = find_first_license(pkg_dir, data)
+    if license_path:
+        try:
+            text = normalize_text(read_text_file(license_path))
+            return [license_path, homepage, name, declared_license, version, text]
+        except Exception as e:
+            return [license_path, homepage, name, declared_license, version, f"[Skipped: {e}]"]
+    # No LICENSE: Path should be the package directory path
+    return [pkg_dir, homepage, name, declared_license, version]  # license columns remain empty
+
+
+def build_rows(manifests, node_modules_root):
+    """
+    For each manifest (i.e., each package), produce one row (see _process_manifest).
+    Manifests are processed concurrently since the work is dominated by file I/O;
+    rows are returned in the same order as manifests.
+    """
+    max_workers = min(32, (os.cpu_count() or 4) * 4)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as ex:
+        return list(ex.map(_process_manifest, manifests))
+
+
+def write_workbook(rows, out_path: str):
+    """
+    Stream rows into an xlsxwriter workbook with a dynamic number of chunk columns.
+    constant_memory flushes each row to disk once the next one starts, so rows must be written in order.
+    LICENSE text (the field after the fixed COLUMNS) is split into chunks cell by cell as it is written.
     """
-    rows = []
-    for manifest_path in manifests:
-        pkg_dir = os.path.dirname(manifest_path)
-        data = parse_manifest(manifest_path)
-
-        homepage = get_homepage(data) or ""
-        declared_license = extract_license_value(data) or ""
-        manifest_name = (data.get("name") or "").strip() if data else ""
-        name = manifest_name or (derive_package_name(pkg_dir) or "")
-        version = (data.get("version") or "").strip() if data else ""
-
-        # Find LICENSE (if any)
-        license_path = find_first_license(pkg_dir)
-        if license_path:
-            try:
-                text = read_text_file(license_path)
-                chunks = chunk_text(text, EXCEL_CELL_LIMIT)
-                rows.append([license_path, homepage, name, declared_license, version, *chunks])
-            except Exception as e:
-                rows.append([license_path, homepage, name, declared_license, version, f"[Skipped: {e}]"])
-        else:
-            # No LICENSE: Path should be the package directory path
-            rows.append([pkg_dir, homepage, name, declared_license, version])  # license columns remain empty
-    return rows
-
-
-def to_dataframe(rows):
-    """Create a DataFrame with dynamic number of columns."""
-    if not rows:
-        return pd.DataFrame(columns=["Path", "Homepage", "Name", "License", "Version", "License_Chunk_1"])
-
-    max_chunks = 0
-    for r in rows:
-        chunks_count = max(0, len(r) - 5)  # minus Path + Homepage + Name + License + Version
-        if chunks_count > max_chunks:
-            max_chunks = chunks_count
-
-    columns = ["Path", "Homepage", "Name", "License", "Version"] + [f"License_Chunk_{i+1}" for i in range(max_chunks)]
-
-    normalized = []
-    for r in rows:
-        path = r[0] if len(r) > 0 else ""
-        homepage = r[1] if len(r) > 1 else ""
-        name = r[2] if len(r) > 2 else ""
-        declared_license = r[3] if len(r) > 3 else ""
-        version = r[4] if len(r) > 4 else ""
-        chunks = r[5:] if len(r) > 5 else []
-        padded = chunks + [""] * (max_chunks - len(chunks))
-        normalized.append([path, homepage, name, declared_license, version] + padded)
-
-    return pd.DataFrame(normalized, columns=columns)
+    fixed = len(COLUMNS)
+    max_chunks = max((chunk_count(r[fixed], EXCEL_CELL_LIMIT) if len(r) > fixed else 0 for r in rows), default=1)
+
+    wb = xlsxwriter.Workbook(out_path, {
+        "constant_memory": True,
+        "strings_to_urls": False,      # homepages/paths stay plain text; skips per-cell URL parsing
+        "strings_to_formulas": False,  # LICENSE text may start with '='
+    })
+    ws = wb.add_worksheet("Licenses")
+
+    for col_idx, (_, width) in enumerate(COLUMNS):
+        ws.set_column(col_idx, col_idx, width)
+    if max_chunks:
+        # All chunk columns share one width: a single range call
+        ws.set_column(fixed, fixed + max_chunks - 1, CHUNK_COLUMN_WIDTH)
+
+    ws.write_row(0, 0, [header for header, _ in COLUMNS] + [f"License_Chunk_{i+1}" for i in range(max_chunks)])
+    for row_idx, r in enumerate(rows, start=1):
+        ws.write_row(row_idx, 0, r[:fixed])
+        if len(r) > fixed:
+            for col_idx, chunk in enumerate(chunk_text(r[fixed], EXCEL_CELL_LIMIT), start=fixed):
+                ws.write_string(row_idx, col_idx, chunk)
+    wb.close()
 
 
 def main():
@@ -322,19 +537,7 @@ def main():
     print(f"Found {len(manifests)} package manifest(s). Building workbook...")
 
     rows = build_rows(manifests, node_modules_root)
-    df = to_dataframe(rows)
-
-    # Write using openpyxl engine
-    with pd.ExcelWriter(args.out, engine="openpyxl") as writer:
-        df.to_excel(writer, index=False, sheet_name="Licenses")
-        ws = writer.sheets["Licenses"]
-        ws.column_dimensions["A"].width = 120  # Path (license file OR package dir)
-        ws.column_dimensions["B"].width = 60   # Homepage
-        ws.column_dimensions["C"].width = 40   # Name
-        ws.column_dimensions["D"].width = 24   # License (declared)
-        ws.column_dimensions["E"].width = 16   # Version
-        for col_idx in range(6, ws.max_column + 1):
-            ws.column_dimensions[ws.cell(row=1, column=col_idx).column_letter].width = 60
+    write_workbook(rows, args.out)
 
     print(f"Done. Wrote {len(rows)} row(s) to {args.out}")
 